@@ -0,0 +1,90 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+scel2rime.py 的可选Cython加速模块
+与scel2rime._scan_word_table_py算法相同，逐字段读取不再经过解释器
+构建：python setup.py build_ext --inplace
+"""
+
+from cpython.bytes cimport PyBytes_FromStringAndSize
+
+# 与scel2rime.py中的_SCAN_VERSION一致，版本不符时scel2rime.py改用纯Python实现
+SCAN_VERSION = 1
+
+cdef inline unsigned int _u16(const unsigned char[::1] buf, Py_ssize_t pos) noexcept nogil:
+    """读取小端无符号短整型（2字节）"""
+    return buf[pos] | (buf[pos + 1] << 8)
+
+def scan_word_table(data, list py_strings, long long min_freq):
+    """扫描汉语词组表，返回(词组原始字节列表, 拼音列表, 词频列表, 解析错误数)"""
+    cdef const unsigned char[::1] buf = data
+    cdef const char *base = <const char *>&buf[0] if buf.shape[0] else NULL
+    cdef Py_ssize_t length = buf.shape[0]
+    cdef Py_ssize_t py_strings_len = len(py_strings)
+    cdef Py_ssize_t pos = 0, py_end, i, word_len
+    cdef unsigned int same_count, py_table_len, ext_len, freq, index, n
+    cdef Py_ssize_t error_count = 0
+    cdef bint truncated = False
+    
+    # 词组先以原始字节收集，由调用方统一解码
+    cdef list word_bytes_list = []
+    cdef list pinyin_list = []
+    cdef list freq_list = []
+    # 拼音索引表字节 -> 拼接好的拼音字符串
+    cdef dict pinyin_cache = {}
+    cdef list pinyin_parts
+    
+    while pos + 4 <= length:
+        # 同音词数量（2字节）、拼音索引表长度（2字节）
+        same_count = _u16(buf, pos)
+        py_table_len = _u16(buf, pos + 2)
+        pos += 4
+        
+        # 拼音索引表原始字节作为缓存键，相同读音只拼接一次并共用同一字符串
+        py_end = pos + (py_table_len & ~1)
+        if py_end > length:
+            # 拼音索引表不完整
+            error_count += 1
+            break
+        py_key = PyBytes_FromStringAndSize(base + pos, py_end - pos)
+        
+        pinyin = pinyin_cache.get(py_key)
+        if pinyin is None:
+            pinyin_parts = []
+            for i in range(pos, py_end, 2):
+                index = _u16(buf, i)
+                if index < py_strings_len:
+                    py_str = py_strings[index]
+                    if py_str:
+                        pinyin_parts.append(py_str)
+            pinyin = ' '.join(pinyin_parts)
+            pinyin_cache[py_key] = pinyin
+        pos = py_end
+        
+        # 解析每个同音词
+        for n in range(same_count):
+            # 中文词组长度（2字节）；词组、扩展信息长度、词频任一不完整即结束解析
+            if pos + 2 > length:
+                truncated = True
+                break
+            word_len = _u16(buf, pos)
+            if pos + 6 + word_len > length:
+                truncated = True
+                break
+            
+            # 扩展信息长度（2字节）、词频（扩展信息前2字节）
+            ext_len = _u16(buf, pos + 2 + word_len)
+            freq = _u16(buf, pos + 4 + word_len)
+            
+            # 过滤无拼音的词组、空词以及低频词；奇数长度时丢弃末尾单字节
+            if pinyin and word_len > 1 and freq >= min_freq:
+                word_bytes_list.append(PyBytes_FromStringAndSize(base + pos + 2, word_len & ~1))
+                pinyin_list.append(pinyin)
+                freq_list.append(freq)
+            
+            pos += 4 + word_len + ext_len
+        
+        if truncated:
+            error_count += 1
+            break
+    
+    return word_bytes_list, pinyin_list, freq_list, error_count
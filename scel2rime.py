@@ -9,33 +9,169 @@ SCEL to RIME YAML Converter
 import struct
 import sys
 import os
+import mmap
 import argparse
+from array import array
 from datetime import datetime
+from itertools import starmap
+from operator import itemgetter
+
+# 搜狗SCEL词库文件头
+_MAGIC = b'\x40\x15\x00\x00\x44\x43\x53\x01\x01\x00\x00\x00'
+
+# 预编译的小端无符号短整型（2字节）解析器
+_U16 = struct.Struct('<H')
+_u16_from = _U16.unpack_from
+# 拼音表条目头：拼音索引+拼音长度
+_PY_HEAD = struct.Struct('<HH')
+_py_head_from = _PY_HEAD.unpack_from
+# array按本机字节序解析，大端机器需要翻转
+_BIG_ENDIAN = sys.byteorder != 'little'
+# 按词组字节长度缓存的“词组+扩展信息长度+词频”解析器
+_word_structs = {}
+
+# 输出文件缓冲区大小
+_WRITE_BUFFER_SIZE = 1 << 20
+# 每批拼接写入的词条数量
+_WRITE_BATCH = 4096
+# RIME词条行：词语\t拼音\t词频
+_format_rime_line = '{}\t{}\t{}\n'.format
+# 词语、拼音中会破坏行格式的字符
+_RIME_FIELD_ESCAPE = str.maketrans('\t\r\n', '   ')
 
 def byte2str(data):
     """将UTF-16LE字节码转为字符串"""
-    i = 0
-    length = len(data)
-    ret = ''
-    while i < length:
+    # 丢弃末尾不成对的字节，整体交给C层解码器处理
+    return bytes(data[:len(data) & ~1]).decode('utf-16-le', 'replace')
+
+def _scan_word_table_py(chinese_data, py_strings, min_freq):
+    """扫描汉语词组表，返回(词组原始字节列表, 拼音列表, 词频列表, 解析错误数)"""
+    py_strings_len = len(py_strings)
+    
+    # 词组先以原始字节收集，循环结束后统一解码
+    word_bytes_list = []
+    pinyin_list = []
+    freq_list = []
+    # 热循环中使用局部别名，省去每次的属性查找
+    append_word = word_bytes_list.append
+    append_pinyin = pinyin_list.append
+    append_freq = freq_list.append
+    # 拼音索引表字节 -> 拼接好的拼音字符串
+    pinyin_cache = {}
+    
+    pos = 0
+    length = len(chinese_data)
+    error_count = 0
+    
+    # 正常数据不会触发异常；记录被截断时unpack_from抛出struct.error，直接结束解析
+    while pos + 4 <= length:
         try:
-            # 每次读取两个字节（UTF-16LE）
-            char_code = struct.unpack('<H', data[i:i+2])[0]
-            ret += chr(char_code)
-            i += 2
-        except:
-            i += 2
-    return ret
+            # 同音词数量（2字节）
+            same_count = _u16_from(chinese_data, pos)[0]
+            pos += 2
+            
+            # 拼音索引表长度（2字节）
+            py_table_len = _u16_from(chinese_data, pos)[0]
+            pos += 2
+            
+            # 拼音索引表原始字节作为缓存键，相同读音只拼接一次并共用同一字符串
+            py_end = pos + (py_table_len & ~1)
+            if py_end > length:
+                # 拼音索引表不完整
+                error_count += 1
+                break
+            py_key = bytes(chinese_data[pos:py_end])
+            pos = py_end
+            
+            pinyin = pinyin_cache.get(py_key)
+            if pinyin is None:
+                # 解析拼音索引表（整段一次性转为无符号短整型数组）
+                py_indices = array('H')
+                py_indices.frombytes(py_key)
+                if _BIG_ENDIAN:
+                    py_indices.byteswap()
+                
+                # 获取并拼接拼音字符串
+                pinyin = pinyin_cache[py_key] = ' '.join([
+                    py_strings[index] for index in py_indices
+                    if index < py_strings_len and py_strings[index]
+                ])
+            
+            # 解析每个同音词
+            for _ in range(same_count):
+                # 中文词组长度（2字节）
+                word_len = _u16_from(chinese_data, pos)[0]
+                
+                # 中文词组内容、扩展信息长度（2字节）、词频（扩展信息前2字节）一次解出
+                word_struct = _word_structs.get(word_len)
+                if word_struct is None:
+                    # 奇数长度时末尾多出的单字节作为填充跳过，保证UTF-16LE对齐
+                    word_struct = _word_structs[word_len] = struct.Struct(
+                        f'<{word_len & ~1}s{word_len & 1}xHH')
+                word_bytes, ext_len, freq = word_struct.unpack_from(chinese_data, pos + 2)
+                pos += 4 + word_len + ext_len
+                
+                # 过滤无拼音的词组、空词以及低频词（长度在解码后过滤）
+                if pinyin and word_bytes and freq >= min_freq:
+                    append_word(word_bytes)
+                    append_pinyin(pinyin)
+                    append_freq(freq)
+                    
+        except struct.error:
+            error_count += 1
+            break
+    
+    return word_bytes_list, pinyin_list, freq_list, error_count
+
+# 与_scel_fast.pyx中的SCAN_VERSION一致；修改扫描逻辑时两边同时递增，避免误用过期的编译产物
+_SCAN_VERSION = 1
+
+try:
+    # 可选的Cython加速模块（见_scel_fast.pyx），需用setup.py另行编译
+    import _scel_fast
+except ImportError:
+    _scel_fast = None
 
-def parse_scel(file_path):
-    """解析SCEL文件"""
+if _scel_fast is not None and getattr(_scel_fast, 'SCAN_VERSION', None) == _SCAN_VERSION:
+    scan_word_table = _scel_fast.scan_word_table
+else:
+    scan_word_table = _scan_word_table_py
+
+def parse_scel(file_path, min_freq=1, min_length=1, max_length=8):
+    """解析SCEL文件，只保留满足词频和长度条件的词条"""
     print(f"正在读取文件: {file_path}")
     
+    # 以只读方式映射文件，按需由系统分页读入，避免整体读取和切片复制
     with open(file_path, 'rb') as f:
-        data = f.read()
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            print("❌ 错误：不是有效的搜狗SCEL词库文件")
+            return None
+        except OSError:
+            # 管道、部分FUSE/网络文件系统上的文件无法映射，退回整体读取
+            mm = None
+            data = f.read()
+    
+    if mm is None:
+        return parse_scel_data(data, min_freq, min_length, max_length)
     
+    try:
+        with memoryview(mm) as data:
+            return parse_scel_data(data, min_freq, min_length, max_length)
+    finally:
+        try:
+            mm.close()
+        except BufferError:
+            # 解析中途出错时，异常回溯仍引用着映射上的切片；交由垃圾回收解除映射，
+            # 避免掩盖原始异常
+            pass
+
+def parse_scel_data(data, min_freq=1, min_length=1, max_length=8):
+    """解析SCEL文件内容（bytes或memoryview），只保留满足词频和长度条件的词条"""
     # 检查文件头
-    if data[:12] != b'\x40\x15\x00\x00\x44\x43\x53\x01\x01\x00\x00\x00':
+    if data[:len(_MAGIC)] != _MAGIC:
         print("❌ 错误：不是有效的搜狗SCEL词库文件")
         return None
     
@@ -44,37 +180,45 @@ def parse_scel(file_path):
     # 汉语词组表偏移
     start_chinese = 0x2628
     
+    if len(data) < start_chinese:
+        print("❌ 错误：SCEL词库文件不完整")
+        return None
+    
     print("🔍 正在解析拼音表...")
     
     # 解析拼音表
     py_table = {}
-    py_data = data[start_py:]
+    py_data = data[start_py:start_chinese]
     
-    pos = 0
+    # 表头（4字节）：拼音总数，只解析这么多条，表尾的空余区域不当作拼音
+    py_total = struct.unpack_from('<I', py_data, 0)[0]
+    pos = 4
     length = len(py_data)
     py_count = 0
+    max_index = -1
     
-    while pos < length:
-        try:
-            # 拼音索引（2字节）
-            index = struct.unpack('<H', py_data[pos:pos+2])[0]
-            pos += 2
-            
-            # 拼音长度（2字节）
-            py_len = struct.unpack('<H', py_data[pos:pos+2])[0]
-            pos += 2
-            
-            # 拼音内容
-            py_str = byte2str(py_data[pos:pos+py_len])
-            pos += py_len
-            
-            py_table[index] = py_str
-            py_count += 1
-            
-        except Exception as e:
-            pos += 1
-            if pos >= length:
-                break
+    while py_count < py_total and pos + 4 <= length:
+        # 拼音索引（2字节）、拼音长度（2字节）
+        index, py_len = _py_head_from(py_data, pos)
+        pos += 4
+        
+        # 拼音内容不完整，说明已到表尾
+        if pos + py_len > length:
+            break
+        
+        # 拼音内容
+        py_str = byte2str(py_data[pos:pos+py_len])
+        pos += py_len
+        
+        py_table[index] = py_str
+        py_count += 1
+        if index > max_index:
+            max_index = index
+    
+    # 拼音索引是连续的小整数，转为列表后可直接按下标查找
+    py_strings = [None] * (max_index + 1)
+    for index, py_str in py_table.items():
+        py_strings[index] = py_str
     
     print(f"✅ 拼音表解析完成，共 {py_count} 个拼音")
     
@@ -82,99 +226,43 @@ def parse_scel(file_path):
     print("🔍 正在解析中文词组...")
     
     chinese_data = data[start_chinese:]
-    entries = []
+    # 词频只有2字节，超出0..65536的阈值与边界值等价；截断后两种实现都能接受
+    min_freq = min(max(min_freq, 0), 0x10000)
+    word_bytes_list, pinyin_list, freq_list, error_count = scan_word_table(
+        chinese_data, py_strings, min_freq)
     
-    pos = 0
-    length = len(chinese_data)
-    entry_count = 0
-    error_count = 0
+    # 以NUL分隔拼接所有词组，一次性解码后再拆分
+    words = b'\x00\x00'.join(word_bytes_list).decode('utf-16-le', 'replace').split('\x00')
+    if len(words) != len(word_bytes_list):
+        # 个别词组本身含有NUL，退回逐个解码
+        words = [byte2str(word_bytes) for word_bytes in word_bytes_list]
     
-    while pos < length:
-        try:
-            # 同音词数量（2字节）
-            same_count = struct.unpack('<H', chinese_data[pos:pos+2])[0]
-            pos += 2
-            
-            # 拼音索引表长度（2字节）
-            py_table_len = struct.unpack('<H', chinese_data[pos:pos+2])[0]
-            pos += 2
-            
-            # 解析拼音索引表
-            py_indices = []
-            for _ in range(py_table_len // 2):
-                py_index = struct.unpack('<H', chinese_data[pos:pos+2])[0]
-                py_indices.append(py_index)
-                pos += 2
-            
-            # 获取拼音字符串
-            pinyin_parts = []
-            for index in py_indices:
-                if index in py_table:
-                    pinyin_parts.append(py_table[index])
-            
-            if not pinyin_parts:
-                pos += same_count * (4 + 10)  # 跳过这个词组
-                continue
-            
-            pinyin = ' '.join(pinyin_parts)
-            
-            # 解析每个同音词
-            for _ in range(same_count):
-                # 中文词组长度（2字节）
-                word_len = struct.unpack('<H', chinese_data[pos:pos+2])[0]
-                pos += 2
-                
-                # 中文词组内容
-                word = byte2str(chinese_data[pos:pos+word_len])
-                pos += word_len
-                
-                # 扩展信息长度（2字节）
-                ext_len = struct.unpack('<H', chinese_data[pos:pos+2])[0]
-                pos += 2
-                
-                # 词频（前2字节）
-                freq = struct.unpack('<H', chinese_data[pos:pos+2])[0]
-                pos += ext_len
-                
-                # 过滤空词和过长的词
-                if word and 1 <= len(word) <= 8:
-                    entries.append((word, pinyin, freq))
-                    entry_count += 1
-                    
-        except Exception as e:
-            error_count += 1
-            pos += 1
-            if pos >= length:
-                break
+    # 过滤长度不符的词
+    entries = [
+        entry for entry in zip(words, pinyin_list, freq_list)
+        if min_length <= len(entry[0]) <= max_length
+    ]
     
     print(f"✅ 中文词组解析完成")
     print(f"📊 统计：")
-    print(f"   - 有效词条：{entry_count}")
+    print(f"   - 有效词条：{len(entries)}")
     print(f"   - 解析错误：{error_count}")
     
     return entries
 
-def generate_rime_yaml(entries, output_file, source_file, min_freq=1, min_length=1, max_length=8):
-    """生成RIME YAML词库"""
+def generate_rime_yaml(entries, output_file, source_file, filter_desc=None):
+    """生成RIME YAML词库（不做过滤；filter_desc为调用方已应用的过滤条件说明，写入文件头）"""
     
-    # 应用过滤条件
-    filtered_entries = []
-    for word, pinyin, freq in entries:
-        if (freq >= min_freq and 
-            min_length <= len(word) <= max_length):
-            filtered_entries.append((word, pinyin, freq))
-    
-    # 按词频排序（降序）
-    filtered_entries.sort(key=lambda x: x[2], reverse=True)
+    # 按词频排序（降序），不修改调用方的列表
+    entries = sorted(entries, key=itemgetter(2), reverse=True)
     
     # 创建文件头
+    filter_line = f"# 过滤条件：{filter_desc}\n" if filter_desc else ""
     yaml_header = f"""# RIME词库
 # 来源：{os.path.basename(source_file)}
 # 生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# 原始词条：{len(entries)}
-# 过滤后词条：{len(filtered_entries)}
-# 过滤条件：词频≥{min_freq}，长度{min_length}-{max_length}字
-
+# 词条数量：{len(entries)}
+{filter_line}
 ---
 name: {os.path.splitext(os.path.basename(output_file))[0]}
 version: "1.0"
@@ -187,18 +275,29 @@ import_tables:
 """
     
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(yaml_header)
+        # 以二进制方式写入预先编码的UTF-8数据，绕过文本层的逐次编码
+        with open(output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(yaml_header.encode('utf-8'))
             
-            for word, pinyin, freq in filtered_entries:
-                # RIME格式：词语 拼音 词频
-                f.write(f"{word}\t{pinyin}\t{freq}\n")
+            # RIME格式：词语 拼音 词频；分批拼接、编码后整块写入，限制峰值内存
+            for start in range(0, len(entries), _WRITE_BATCH):
+                batch = entries[start:start + _WRITE_BATCH]
+                text = ''.join(starmap(_format_rime_line, batch))
+                if (text.count('\n') != len(batch) or text.count('\t') != 2 * len(batch)
+                        or '\r' in text):
+                    # 个别词条含有制表符或换行，替换为空格后重新拼接，避免破坏行格式
+                    text = ''.join([
+                        _format_rime_line(word.translate(_RIME_FIELD_ESCAPE),
+                                          pinyin.translate(_RIME_FIELD_ESCAPE), freq)
+                        for word, pinyin, freq in batch
+                    ])
+                f.write(text.encode('utf-8'))
         
         print(f"✅ 文件保存成功：{output_file}")
         print(f"📋 文件信息：")
         print(f"   - 编码格式：UTF-8")
         print(f"   - 文件大小：{os.path.getsize(output_file) // 1024} KB")
-        print(f"   - 词条数量：{len(filtered_entries)}")
+        print(f"   - 词条数量：{len(entries)}")
         
         return True
         
@@ -265,13 +364,19 @@ def main():
     print("开始转换...")
     print(f"输入文件：{input_file}")
     print(f"输出文件：{output_file}")
-    print(f"过滤条件：词频≥{args.freq}，长度{args.min_length}-{args.max_length}字")
+    filter_desc = f"词频≥{args.freq}，长度{args.min_length}-{args.max_length}字"
+    print(f"过滤条件：{filter_desc}")
     print("=" * 60)
     
     # 解析SCEL文件
-    entries = parse_scel(input_file)
+    entries = parse_scel(
+        input_file,
+        min_freq=args.freq,
+        min_length=args.min_length,
+        max_length=args.max_length
+    )
     
-    if entries:
+    if entries is not None:
         print("\n📝 开始生成RIME词库...")
         
         # 生成YAML文件
@@ -279,9 +384,7 @@ def main():
             entries, 
             output_file, 
             input_file,
-            min_freq=args.freq,
-            min_length=args.min_length,
-            max_length=args.max_length
+            filter_desc=filter_desc
         )
         
         if success:
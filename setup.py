@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+安装scel2rime.py并构建可选的Cython加速模块
+用法：pip install .  或  python setup.py build_ext --inplace
+加速模块编译失败时仍会安装，scel2rime.py自动使用纯Python实现
+"""
+
+from setuptools import Extension, setup
+
+setup(
+    name='scel2rime',
+    version='1.0',
+    py_modules=['scel2rime'],
+    # 加速模块可选：没有C编译器等导致编译失败时只给出警告，仍安装纯Python实现
+    # 不经cythonize（会丢掉optional），由setuptools在安装了Cython时自动转换.pyx
+    ext_modules=[
+        Extension('_scel_fast', ['_scel_fast.pyx'], optional=True),
+    ],
+    entry_points={
+        'console_scripts': ['scel2rime = scel2rime:main'],
+    },
+)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+scel2rime.py 词组表扫描测试
+纯Python实现与Cython加速模块（已编译时）须对同一输入给出相同结果
+"""
+
+import struct
+
+import pytest
+
+import scel2rime
+
+_PINYINS = ['a', 'ba', 'ci', 'de', 'e']
+
+
+def _group(words, indices=(0,), freq=7):
+    """构造一个同音词组：words为词组原始字节列表"""
+    data = struct.pack('<HH', len(words), 2 * len(indices))
+    data += struct.pack(f'<{len(indices)}H', *indices)
+    for word in words:
+        data += struct.pack('<H', len(word)) + word
+        data += struct.pack('<HH', 10, freq) + bytes(8)
+    return data
+
+
+def _build_scel():
+    """构造一个覆盖各种边界情况的SCEL文件"""
+    data = bytearray(scel2rime._MAGIC) + bytearray(0x1540 - len(scel2rime._MAGIC))
+    table = struct.pack('<I', len(_PINYINS))
+    for index, pinyin in enumerate(_PINYINS):
+        py_bytes = pinyin.encode('utf-16-le')
+        table += struct.pack('<HH', index, len(py_bytes)) + py_bytes
+    # 拼音表之后的空余区域保持为0
+    data += table + bytes(0x2628 - len(data) - len(table))
+    data += _group(['中文'.encode('utf-16-le'), '词'.encode('utf-16-le') + b'\x41'], (0, 4))
+    data += _group([b'', b'x', 'ab'.encode('utf-16-le')], (1,), freq=3)
+    data += _group(['a\x00b'.encode('utf-16-le')], (2,))
+    data += _group(['无拼音'.encode('utf-16-le')], (999,))
+    data += _group(['无索引'.encode('utf-16-le')], ())
+    data += _group(['尾'.encode('utf-16-le')], (3, 1), freq=65535)
+    return bytes(data)
+
+
+def _scanners():
+    scanners = [scel2rime._scan_word_table_py]
+    if scel2rime.scan_word_table is not scel2rime._scan_word_table_py:
+        scanners.append(scel2rime.scan_word_table)
+    return scanners
+
+
+def test_parse_scel_data(capsys):
+    entries = scel2rime.parse_scel_data(_build_scel(), min_length=1, max_length=8)
+    assert entries == [
+        ('中文', 'a e', 7),
+        ('词', 'a e', 7),
+        ('ab', 'ba', 3),
+        ('a\x00b', 'ci', 7),
+        ('尾', 'de ba', 65535),
+    ]
+    assert '共 5 个拼音' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('min_freq', [-1, 0, 4, 65535, 2 ** 40])
+def test_min_freq_out_of_range(min_freq, capsys):
+    entries = scel2rime.parse_scel_data(_build_scel(), min_freq=min_freq)
+    assert all(freq >= min_freq for _, _, freq in entries)
+
+
+def test_extension_is_current():
+    if scel2rime._scel_fast is None:
+        pytest.skip('Cython加速模块未编译')
+    assert scel2rime._scel_fast.SCAN_VERSION == scel2rime._SCAN_VERSION
+    assert scel2rime.scan_word_table is scel2rime._scel_fast.scan_word_table
+
+
+def test_scanners_agree():
+    scanners = _scanners()
+    if len(scanners) < 2:
+        pytest.skip('Cython加速模块未编译')
+    data = _build_scel()
+    py_strings = [None, 'a', '', 'b']
+    # 逐字节截断，覆盖各种不完整记录
+    for end in range(0x2628, len(data) + 1):
+        chinese_data = memoryview(data)[0x2628:end]
+        for min_freq in (0, 4):
+            results = [scan(chinese_data, py_strings, min_freq) for scan in scanners]
+            assert results[0] == results[1], end
+
+
+def test_generate_rime_yaml_escapes_control_chars(tmp_path, capsys):
+    entries = [
+        ('普通', 'pu tong', 5),
+        ('制\t表', 'zhi\tbiao', 9),
+        ('换\n行', 'huan\nhang', 1),
+        ('回\r车', 'hui\rche', 7),
+    ]
+    original = list(entries)
+    output_file = tmp_path / 'test.dict.yaml'
+    assert scel2rime.generate_rime_yaml(entries, str(output_file), 'test.scel')
+    
+    # 调用方的列表不被排序
+    assert entries == original
+    
+    body = output_file.read_bytes().decode('utf-8').split('...\n', 1)[1]
+    lines = body.lstrip('\n').split('\n')
+    assert lines.pop() == ''
+    assert lines == [
+        '制 表\tzhi biao\t9',
+        '回 车\thui che\t7',
+        '普通\tpu tong\t5',
+        '换 行\thuan hang\t1',
+    ]